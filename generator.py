@@ -21,6 +21,9 @@ import xml.etree.ElementTree as ET
 from xml.dom import minidom
 import sqlite3
 import math
+import hashlib
+import os
+import shutil
 
 # Create database connection to an in-memory database for route compilation
 connection_object = sqlite3.connect(":memory:")
@@ -29,11 +32,49 @@ cursor_object = connection_object.cursor()
 
 # Load navigational databases:
 
-with open('airports.json', 'rt') as airports_json:
-    airports = json.load(airports_json)
-
-with open('nav_data.json', 'rt') as waypoints_json:
-    waypoints = json.load(waypoints_json)
+with open('airports.json', 'rb') as airports_json:
+    airports_raw = airports_json.read()
+airports = json.loads(airports_raw)
+
+with open('nav_data.json', 'rb') as waypoints_json:
+    waypoints_raw = waypoints_json.read()
+waypoints = json.loads(waypoints_raw)
+
+# fingerprint of the loaded databases, so cached output is rebuilt on update
+nav_db_version = hashlib.sha256(airports_raw + waypoints_raw).hexdigest()
+
+# Output cache:
+# rendered FMC JSON and KML files are kept on disk in cache_dir, one
+# directory per route, and reused whenever the same route is generated again
+
+cache_dir = "fmc_cache"
+# least recently used routes are evicted when the cache grows beyond this
+cache_max_bytes = 50 * 1024 * 1024
+# hard-link dumpfiles to the (read-only) cached files instead of copying them
+cache_hard_link = False
+# bump whenever generate_kml or write_route_json output changes
+cache_format_version = 1
+
+cache_stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+# Edit journal:
+# every route edit is kept as a delta in "ops", with "pos" pointing just past
+# the last applied one; undo/redo moves pos and applies a single delta.
+# If a journal file is given, each record is appended to it as a JSON line:
+# ["session", dep, lat_dep, lon_dep, arr, lat_arr, lon_arr, fltnbr]
+# ["insert", waypoint_id, ["waypoint", lat, lon, alt, in_db, "notes"]]
+# ["delete", waypoint_id, ["waypoint", lat, lon, alt, in_db, "notes"]]
+# ["move", from_id, to_id]
+# ["undo"], ["redo"]
+# ["snapshot", [[waypoint_id, "waypoint", lat, lon, alt, in_db, "notes"]]]
+
+journal = {"ops": [], "pos": 0, "file": None, "since_snapshot": 0}
+# a snapshot of the route is written every this many records, so resuming
+# a long session only has to replay the edits made since the last one
+journal_snapshot_interval = 100
+
+# index used to look up and renumber waypoints by ID
+create_index = "CREATE INDEX Route_waypoint_id ON Route(Waypoint_id)"
 
 # Route variable usage:
 # ["dep","arr","fltnbr",[["waypoint", lat, lon, alt, in_db, "notes"],
@@ -103,46 +144,401 @@ def waypoint_info(waypoint_id):
     return waypoint_contents
 
 
-# orders rows by ID
-def row_order():
+# inserts a waypoint at an ID, shifting the following waypoints down
+def row_insert_at(waypoint_id, row):
     cursor_object.execute(
-        "CREATE TABLE Route_temp AS SELECT * FROM Route ORDER BY Waypoint_id")
-    cursor_object.execute("DROP TABLE Route")
-    cursor_object.execute("CREATE TABLE Route AS SELECT * FROM Route_temp")
-    cursor_object.execute("DROP TABLE Route_temp")
+        "UPDATE Route SET Waypoint_id=Waypoint_id+1 WHERE Waypoint_id>=?",
+        [waypoint_id]
+        )
+    insert_row(waypoint_id, *row)
 
 
-# function for naming waypoint IDs during route creation
-def row_move(waypoint_id, direction):
-    if direction == "up":
-        # move the previous waypoint to far away
-        cursor_object.execute(
-            ("UPDATE Route SET Waypoint_id=10000000 WHERE Waypoint_id=?"),
-            [waypoint_id-1]
-            )
-        # move the waypoint to be moved to the place just vacated
-        cursor_object.execute(
-            "UPDATE Route SET Waypoint_id=Waypoint_id-1 WHERE Waypoint_id=?",
-            [waypoint_id]
-            )
-    elif direction == "down":
-        # move the next waypoint to a place far away
+# removes the waypoint at an ID, shifting the following waypoints up
+def row_remove_at(waypoint_id):
+    cursor_object.execute(
+        "DELETE FROM Route WHERE Waypoint_id=?", [waypoint_id]
+        )
+    cursor_object.execute(
+        "UPDATE Route SET Waypoint_id=Waypoint_id-1 WHERE Waypoint_id>?",
+        [waypoint_id]
+        )
+
+
+# moves a waypoint to another ID, shifting the ones in between by one
+def row_shift(from_id, to_id):
+    cursor_object.execute(
+        "UPDATE Route SET Waypoint_id=10000000 WHERE Waypoint_id=?",
+        [from_id]
+        )
+    if from_id < to_id:
         cursor_object.execute(
-            ("UPDATE Route SET Waypoint_id=10000000 WHERE Waypoint_id=?"),
-            [waypoint_id+1]
+            "UPDATE Route SET Waypoint_id=Waypoint_id-1 "
+            "WHERE Waypoint_id>? AND Waypoint_id<=?",
+            [from_id, to_id]
             )
-        # move the waypoint to be moved to the place just vacated
+    else:
         cursor_object.execute(
-            "UPDATE Route SET Waypoint_id=Waypoint_id+1 WHERE Waypoint_id=?",
-            [waypoint_id]
+            "UPDATE Route SET Waypoint_id=Waypoint_id+1 "
+            "WHERE Waypoint_id>=? AND Waypoint_id<?",
+            [to_id, from_id]
             )
-        # move the far-away waypoint to the place vacated by the moved waypoint
     cursor_object.execute(
         "UPDATE Route SET Waypoint_id=? WHERE Waypoint_id=10000000",
-        [waypoint_id]
+        [to_id]
         )
 
 
+# Journal functions
+
+# applies a journalled edit to the table, or reverts it if undo is set
+def journal_apply(op, undo):
+    if op[0] == "insert":
+        if undo:
+            row_remove_at(op[1])
+        else:
+            row_insert_at(op[1], op[2])
+    elif op[0] == "delete":
+        if undo:
+            row_insert_at(op[1], op[2])
+        else:
+            row_remove_at(op[1])
+    elif op[0] == "move":
+        if undo:
+            row_shift(op[2], op[1])
+        else:
+            row_shift(op[1], op[2])
+
+
+# appends a record to the journal file, adding a snapshot when one is due
+def journal_write(record):
+    if journal["file"] is None:
+        return
+    try:
+        with open(journal["file"], "at") as journal_file:
+            journal_file.write(json.dumps(record) + "\n")
+            journal["since_snapshot"] += 1
+            if journal["since_snapshot"] >= journal_snapshot_interval:
+                cursor = cursor_object.execute(
+                    "SELECT * FROM Route ORDER BY Waypoint_id")
+                rows = [list(row) for row in cursor.fetchall()]
+                journal_file.write(json.dumps(["snapshot", rows]) + "\n")
+                journal["since_snapshot"] = 0
+    except OSError as error:
+        # the route itself is unaffected, so carry on without the journal
+        print(f"Could not write to journal {journal['file']} ({error}), "
+              "journalling stopped.")
+        journal["file"] = None
+
+
+# records an edit which has just been made, discarding any redo history
+def journal_record(op):
+    del journal["ops"][journal["pos"]:]
+    journal["ops"].append(op)
+    journal["pos"] += 1
+    journal_write(op)
+
+
+def journal_undo():
+    if journal["pos"] == 0:
+        print("Nothing to undo.")
+        return
+    journal["pos"] -= 1
+    op = journal["ops"][journal["pos"]]
+    journal_apply(op, True)
+    journal_write(["undo"])
+    print(f"Undid {op[0]} of waypoint {op[1]}.")
+
+
+def journal_redo():
+    if journal["pos"] == len(journal["ops"]):
+        print("Nothing to redo.")
+        return
+    op = journal["ops"][journal["pos"]]
+    journal_apply(op, False)
+    journal["pos"] += 1
+    journal_write(["redo"])
+    print(f"Redid {op[0]} of waypoint {op[1]}.")
+
+
+# starts a new journal file with the session's initial params
+def journal_start(filename, session):
+    journal["file"] = filename
+    journal_write(["session", *session])
+
+
+# reads and checks the records of an existing journal file
+def journal_read(filename):
+    with open(filename, "rt") as journal_file:
+        lines = [line for line in journal_file if line.strip()]
+
+    records = []
+    for i, line in enumerate(lines):
+        try:
+            records.append(json.loads(line))
+        except ValueError:
+            # only the last record can be cut short by an interrupted append
+            if i < len(lines) - 1:
+                raise ValueError("not a journal file")
+
+    journal_check(records)
+
+    if len(records) < len(lines):
+        print("Skipping incomplete last record of journal.")
+    # rewrite a damaged journal, so new records don't follow a partial line
+    if not lines[-1].endswith("\n") or len(records) < len(lines):
+        # under a temporary name, so an interrupted rewrite loses nothing
+        temp_name = f"{filename}.{os.getpid()}.tmp"
+        with open(temp_name, "wt") as journal_file:
+            for record in records:
+                journal_file.write(json.dumps(record) + "\n")
+        os.replace(temp_name, filename)
+    return records
+
+
+# steps through a journal's records without applying them, checking each
+# record's shape and that undo/redo and waypoint IDs stay in range
+def journal_check(records):
+    header = records[0] if records else None
+    if (not isinstance(header, list) or len(header) != 8
+            or header[0] != "session"):
+        raise ValueError("not a journal file")
+
+    ops = []
+    pos = 0
+    num_waypoints = 0
+    for record in records[1:]:
+        if not isinstance(record, list) or len(record) == 0:
+            raise ValueError("not a journal file")
+
+        if record[0] == "snapshot" and len(record) == 2:
+            rows = record[1]
+            if not (isinstance(rows, list)
+                    and all(isinstance(row, list) and len(row) == 7
+                            for row in rows)):
+                raise ValueError("not a journal file")
+            num_waypoints = len(rows)
+            continue
+
+        if record == ["undo"] and pos > 0:
+            pos -= 1
+            op = ops[pos]
+            undo = True
+        elif record == ["redo"] and pos < len(ops):
+            op = ops[pos]
+            pos += 1
+            undo = False
+        elif (record[0] in ("insert", "delete") and len(record) == 3
+                and isinstance(record[1], int)
+                and isinstance(record[2], list) and len(record[2]) == 6):
+            op = record
+            undo = False
+        elif (record[0] == "move" and len(record) == 3
+                and isinstance(record[1], int)
+                and isinstance(record[2], int)):
+            op = record
+            undo = False
+        else:
+            raise ValueError("not a journal file")
+
+        if op is record:
+            del ops[pos:]
+            ops.append(op)
+            pos += 1
+
+        if op[0] == "move":
+            in_range = (0 < op[1] <= num_waypoints
+                        and 0 < op[2] <= num_waypoints)
+        elif (op[0] == "insert") != undo:
+            num_waypoints += 1
+            in_range = 0 < op[1] <= num_waypoints
+        else:
+            in_range = 0 < op[1] <= num_waypoints
+            num_waypoints -= 1
+        if not in_range:
+            raise ValueError("not a journal file")
+
+
+# rebuilds the route and the undo history from a journal's records
+def journal_resume(filename, records):
+
+    # the table only needs rebuilding from the last snapshot onwards
+    start = 0
+    for i, record in enumerate(records):
+        if record[0] == "snapshot":
+            start = i
+
+    for i, record in enumerate(records[1:], 1):
+        replay = i > start
+        if record[0] == "snapshot":
+            if i == start:
+                for row in record[1]:
+                    insert_row(*row)
+        elif record[0] == "undo":
+            journal["pos"] -= 1
+            if replay:
+                journal_apply(journal["ops"][journal["pos"]], True)
+        elif record[0] == "redo":
+            if replay:
+                journal_apply(journal["ops"][journal["pos"]], False)
+            journal["pos"] += 1
+        else:
+            del journal["ops"][journal["pos"]:]
+            journal["ops"].append(record)
+            journal["pos"] += 1
+            if replay:
+                journal_apply(record, False)
+
+    journal["file"] = filename
+    journal["since_snapshot"] = len(records) - 1 - start
+    # dep, lat_dep, lon_dep, arr, lat_arr, lon_arr, fltnbr
+    return records[0][1:]
+
+
+# Cache functions
+
+# hashes the normalized route input together with the nav database version
+def cache_key(route_dict):
+    normalized = json.dumps(
+        [route_dict, lat_dep, lon_dep, lat_arr, lon_arr,
+         nav_db_version, cache_format_version],
+        separators=(",", ":")
+        )
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+# hashes the contents of a file
+def cache_file_hash(path):
+    with open(path, "rb") as cached_file:
+        return hashlib.sha256(cached_file.read()).hexdigest()
+
+
+# checks a cached file against the content hash stored when it was built
+def cache_valid(path):
+    try:
+        with open(path + ".sha256", "rt") as hash_file:
+            expected = hash_file.read()
+        return cache_file_hash(path) == expected
+    except FileNotFoundError:
+        return False
+
+
+# returns the path of a cached output file, calling build(path, *args)
+# to create it if the route has not been seen before
+def cache_fetch(key, filename, build, *args):
+    entry = os.path.join(cache_dir, key)
+    path = os.path.join(entry, filename)
+    if cache_valid(path):
+        try:
+            # mark the entry as recently used
+            os.utime(entry)
+            cache_stats["hits"] += 1
+            return path
+        except FileNotFoundError:
+            # evicted by another process in the meantime
+            pass
+    os.makedirs(entry, exist_ok=True)
+    # build under a temporary name so an interrupted run leaves no entry
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    build(temp_path, *args)
+    with open(path + ".sha256", "wt") as hash_file:
+        hash_file.write(cache_file_hash(temp_path))
+    # read-only, so a hard-linked dumpfile can't silently change the entry
+    os.chmod(temp_path, 0o444)
+    os.replace(temp_path, path)
+    cache_stats["misses"] += 1
+    cache_evict(key)
+    return path
+
+
+# lists (last use, size, key) for every entry in the cache, skipping stray
+# files and entries removed by another process while listing
+def cache_entries():
+    entries = []
+    for key in os.listdir(cache_dir):
+        entry = os.path.join(cache_dir, key)
+        if not os.path.isdir(entry):
+            continue
+        try:
+            size = sum(os.path.getsize(os.path.join(entry, filename))
+                       for filename in os.listdir(entry))
+            entries.append((os.path.getmtime(entry), size, key))
+        except FileNotFoundError:
+            continue
+    return entries
+
+
+# removes least recently used entries until the cache fits cache_max_bytes
+def cache_evict(keep_key):
+    entries = cache_entries()
+    total_size = sum(size for mtime, size, key in entries)
+    entries.sort()
+    for mtime, size, key in entries:
+        if total_size <= cache_max_bytes:
+            break
+        if key == keep_key:
+            continue
+        entry = os.path.join(cache_dir, key)
+        try:
+            # read-only files can't be removed on Windows
+            for filename in os.listdir(entry):
+                os.chmod(os.path.join(entry, filename), 0o644)
+            shutil.rmtree(entry)
+            cache_stats["evictions"] += 1
+        except FileNotFoundError:
+            # already evicted by another process
+            pass
+        except OSError as error:
+            print(f"Could not evict {entry} from output cache ({error})")
+        total_size -= size
+
+
+# copies a cached file to the user's dumpfile, or hard-links it if enabled
+def cache_export(path, dumpfile_name):
+    # unlink first so a cached file is never overwritten through a link
+    if os.path.lexists(dumpfile_name):
+        os.remove(dumpfile_name)
+    if cache_hard_link:
+        try:
+            os.link(path, dumpfile_name)
+            return
+        except OSError:
+            # e.g. a different filesystem, or no hard link support
+            pass
+    shutil.copyfile(path, dumpfile_name)
+
+
+# writes an output file through the cache, calling build(dumpfile, *args)
+# directly if the cache can't be used; errors writing the dumpfile itself
+# are left to the caller
+def cached_write(key, filename, dumpfile_name, build, *args):
+    try:
+        path = cache_fetch(key, filename, build, *args)
+    except OSError as error:
+        print(f"Output cache unavailable ({error}), writing directly.")
+        build(dumpfile_name, *args)
+        return
+    try:
+        cache_export(path, dumpfile_name)
+    except FileNotFoundError:
+        # evicted by another process since it was fetched
+        if os.path.exists(path):
+            raise
+        build(dumpfile_name, *args)
+
+
+def print_cache_stats():
+    try:
+        entries = cache_entries() if os.path.isdir(cache_dir) else []
+    except OSError:
+        entries = []
+    total_size = sum(size for mtime, size, key in entries)
+    print(f"Output cache: {cache_stats['hits']} hit(s), "
+          f"{cache_stats['misses']} miss(es), "
+          f"{cache_stats['evictions']} eviction(s); "
+          f"{len(entries)} route(s), {round(total_size / 1024, 1)} kB "
+          f"in {cache_dir}")
+
+
 # KML functions
 
 def add_waypoint(waypoint, lat, lon, alt, notes, root):
@@ -220,7 +616,7 @@ def generate_kml(dumpfilename, route_dict, insert_arr):
         dumpfile.write(doc.toprettyxml(encoding='utf-8'))
 
 
-def route_to_kml_menu(route_dict):
+def route_to_kml_menu(route_dict, route_key):
     while True:
         print("Export route as Google Maps file? (y/n)")
         write_to_file = input(">")
@@ -250,9 +646,13 @@ def route_to_kml_menu(route_dict):
 
         insert_arr = True if insert_arr == "y" else False
 
-        generate_kml(dumpfile, route_dict, insert_arr)
-
-        print(f"Route map has been written to {dumpfile}")
+        kml_name = "route_arr.kml" if insert_arr else "route.kml"
+        try:
+            cached_write(route_key, kml_name, dumpfile,
+                         generate_kml, route_dict, insert_arr)
+            print(f"Route map has been written to {dumpfile}")
+        except OSError as error:
+            print(f"Could not write route map to {dumpfile} ({error})")
 
     else:
         print("Skipping Google Maps route generation")
@@ -353,7 +753,7 @@ def print_waypoints_list(waypoint, opt_len):
 
 
 def print_route_intermediate():
-    cursor_object.execute("select * from Route")
+    cursor_object.execute("select * from Route order by Waypoint_id")
     results = cursor_object.fetchall()
     if len(results) == 0:
         print("No route yet!")
@@ -449,21 +849,13 @@ def add_waypoint_menu():
         in_db = False
 
         insert_row(waypoint_id, waypoint, lat, lon, alt, in_db, notes)
+        journal_record(["insert", waypoint_id,
+                        [waypoint, lat, lon, alt, in_db, notes]])
 
     else:
         print("cancelling waypoint insertion")
 
 
-# moves row to bottom, deletes it, reduces waypoint_num by one
-def row_delete(waypt_id, num_waypoints):
-    for i in range(waypt_id, num_waypoints):
-        row_move(i, "down")
-    cursor_object.execute(
-        "DELETE FROM Route WHERE Waypoint_id=?", [num_waypoints]
-        )
-    row_order()
-
-
 def row_delete_menu():
     print_route_intermediate()
     num_waypoints = waypoint_counter()
@@ -476,14 +868,22 @@ def row_delete_menu():
             print("Enter y to confirm, anything else to cancel.")
             confirm = input(">")
             if confirm == "y":
-                row_delete(waypt_id, num_waypoints)
+                info = waypoint_info(waypt_id)
+                row_remove_at(waypt_id)
+                journal_record(["delete", waypt_id,
+                                [info["waypoint"],
+                                 info["lat"],
+                                 info["lon"],
+                                 info["alt"],
+                                 info["in_db"],
+                                 info["notes"]]])
             else:
                 print("Cancelling waypoint deletion.")
         else:
             print("Not a waypoint option, sorry")
 
 
-# iteratively shifts the waypoint one step at a time shift_spaces times
+# shifts a waypoint shift_spaces places up or down the route
 def row_move_menu():
     waypoint_num = waypoint_counter()
 
@@ -513,9 +913,9 @@ def row_move_menu():
     if direction == "u":
         end_id = waypt_id - shift_spaces
         if end_id > 0:
-            for i in range(waypt_id, end_id, -1):
-                row_move(i, "up")
-            row_order()
+            if shift_spaces > 0:
+                row_shift(waypt_id, end_id)
+                journal_record(["move", waypt_id, end_id])
             print("Waypoint has been shifted", shift_spaces, "space(s) up.")
         else:
             print("Choice exceeds route range; please try again.")
@@ -523,9 +923,9 @@ def row_move_menu():
     elif direction == "d":
         end_id = waypt_id + shift_spaces
         if end_id <= waypoint_num:
-            for i in range(waypt_id, end_id):
-                row_move(i, "down")
-            row_order()
+            if shift_spaces > 0:
+                row_shift(waypt_id, end_id)
+                journal_record(["move", waypt_id, end_id])
             print("Waypoint has been shifted", shift_spaces, "space(s) down.")
         else:
             print("Choice exceeds route range; please try again.")
@@ -543,7 +943,12 @@ def airport_coords(icao):
     return lat, lon
 
 
-def route_to_file_menu(json_route):
+def write_route_json(dumpfilename, route_dict):
+    with open(dumpfilename, "w") as dumpfile:
+        dumpfile.write(json.dumps(route_dict))
+
+
+def route_to_file_menu(route_dict, route_key):
     while True:
         print("Write route to file? (y/n)")
         write_to_file = input(">")
@@ -560,9 +965,12 @@ def route_to_file_menu(json_route):
     if write_to_file:
         print("Please type the filename for your plaintext dumpfile")
         dumpfile_name = input(">")
-        with open(dumpfile_name, "w") as dumpfile:
-            dumpfile.write(json_route)
-        print(f"Route has been written to {dumpfile_name}")
+        try:
+            cached_write(route_key, "route.json", dumpfile_name,
+                         write_route_json, route_dict)
+            print(f"Route has been written to {dumpfile_name}")
+        except OSError as error:
+            print(f"Could not write route to {dumpfile_name} ({error})")
 
     else:
         print("Skipping write of route to file.")
@@ -575,6 +983,8 @@ def route_menu():
               "i to insert a waypoint\n"
               "s to shift a waypoint\n"
               "d to delete a waypoint\n"
+              "u to undo the last edit\n"
+              "r to redo an undone edit\n"
               "v to view route\n"
               "x to return to main menu")
         insert = input(">").lower()
@@ -593,6 +1003,12 @@ def route_menu():
         elif insert == "d":
             row_delete_menu()
 
+        elif insert == "u":
+            journal_undo()
+
+        elif insert == "r":
+            journal_redo()
+
         elif insert == "v":
             print_route_intermediate()
 
@@ -643,6 +1059,28 @@ def intro():
     return dep, lat_dep, lon_dep, arr, lat_arr, lon_arr, fltnbr
 
 
+# optional journal file for saving and resuming the session
+# returns the file name, and its records if it is an existing journal
+def journal_menu():
+    while True:
+        print("Journal file to save this session to, or to resume from if it "
+              "already exists (full path).")
+        print("Press Enter to skip.")
+        filename = input(">")
+        if filename == "":
+            return None, None
+        try:
+            if os.path.isfile(filename) and os.path.getsize(filename) > 0:
+                records = journal_read(filename)
+            else:
+                records = None
+            # make sure the session can be saved before the route is entered
+            open(filename, "at").close()
+            return filename, records
+        except (OSError, ValueError) as error:
+            print(f"Cannot use {filename} as a journal: {error}")
+
+
 def main():
     # HACK: it's a pain to pass them all the way through
     global lat_dep
@@ -650,14 +1088,25 @@ def main():
     global lat_arr
     global lon_arr
 
-    # initial params by user
-    dep, lat_dep, lon_dep, arr, lat_arr, lon_arr, fltnbr = intro()
-
     # table containing list of waypoints in route
     create_table = ("CREATE TABLE Route(Waypoint_id INTEGER, Waypoint TEXT, "
                     "Latitude REAL, Longitude REAL, Altitude INTEGER, "
                     "In_db INTEGER, Notes TEXT)")
     cursor_object.execute(create_table)
+    cursor_object.execute(create_index)
+
+    journal_file, journal_records = journal_menu()
+
+    if journal_records is not None:
+        (dep, lat_dep, lon_dep, arr, lat_arr, lon_arr,
+         fltnbr) = journal_resume(journal_file, journal_records)
+        print(f"Resumed route {dep}-{arr} from {journal_file}")
+    else:
+        # initial params by user
+        dep, lat_dep, lon_dep, arr, lat_arr, lon_arr, fltnbr = intro()
+        if journal_file is not None:
+            journal_start(journal_file, [dep, lat_dep, lon_dep,
+                                         arr, lat_arr, lon_arr, fltnbr])
 
     main_menu()
 
@@ -667,12 +1116,15 @@ def main():
 
     route_dict = route_dict_creator(dep, arr, fltnbr)
     route_json = json.dumps(route_dict)
+    route_key = cache_key(route_dict)
     print("\nYour FMC flight plan is\n")
     print(route_json, "\n")
 
-    route_to_file_menu(route_json)
+    route_to_file_menu(route_dict, route_key)
+
+    route_to_kml_menu(route_dict, route_key)
 
-    route_to_kml_menu(route_dict)
+    print_cache_stats()
 
     # input("press enter to exit")
     connection_object.close()